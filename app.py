@@ -1,22 +1,145 @@
+import json
 import os
+import queue
+import re
 import sqlite3
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, render_template, request, redirect, url_for
+from flask import Flask, abort, render_template, request, redirect, url_for
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "pola_tanam.db"
+DB_PATH = Path(os.getenv("POLA_TANAM_DB", BASE_DIR / "pola_tanam.db"))
+WRITE_BATCH_SIZE = 64
+WRITE_TIMEOUT = float(os.getenv("POLA_TANAM_WRITE_TIMEOUT", "30"))
 
 app = Flask(__name__)
 app.config["GEOAPIFY_API_KEY"] = os.getenv("GEOAPIFY_API_KEY", "YOUR_GEOAPIFY_KEY")
 
+_write_queue = None
+_writer_thread = None
+
+
+class WriteOutcomeUnknown(RuntimeError):
+    pass
+
 
 def get_db():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
 
+def start_writer():
+    global _write_queue, _writer_thread
+    if _write_queue is not None:
+        return
+    _write_queue = queue.Queue()
+    _writer_thread = threading.Thread(
+        target=_writer_loop, args=(_write_queue,), name="db-writer", daemon=True
+    )
+    _writer_thread.start()
+
+
+def _writer_loop(jobs):
+    # One connection owns every write. Jobs queued while a transaction is
+    # running are committed together; each gets a savepoint so one failing
+    # job does not roll back the others. Nothing here may end the loop:
+    # a dead writer would leave every later write waiting on its future.
+    conn = None
+    while True:
+        batch = [jobs.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(jobs.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            if conn is None:
+                conn = get_db()
+                conn.isolation_level = None
+            results = _write_batch(conn, batch)
+        except Exception as exc:
+            results = [(future, None, exc) for _, future in batch]
+            # The connection may be unusable; reconnect on the next batch.
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+
+        for future, result, exc in results:
+            try:
+                if exc is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(exc)
+            except InvalidStateError:
+                # The caller cancelled a job this batch never reached.
+                pass
+
+
+def _write_batch(conn, batch):
+    results = []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for job, future in batch:
+            # Checked right before the job runs: once it is RUNNING the
+            # caller can no longer cancel it, so a job whose caller timed
+            # out while an earlier job was busy is skipped here.
+            if not future.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT job")
+            try:
+                results.append((future, job(conn), None))
+                conn.execute("RELEASE job")
+            except Exception as exc:
+                conn.execute("ROLLBACK TO job")
+                conn.execute("RELEASE job")
+                results.append((future, None, exc))
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return results
+
+
+def run_write(job):
+    if _write_queue is None:
+        conn = get_db()
+        try:
+            with conn:
+                return job(conn)
+        finally:
+            conn.close()
+
+    if not _writer_thread.is_alive():
+        raise RuntimeError("database writer thread is not running")
+    future = Future()
+    _write_queue.put((job, future))
+    try:
+        return future.result(timeout=WRITE_TIMEOUT)
+    except FutureTimeoutError:
+        if future.cancel():
+            raise
+    # The job already started, so it may still commit. Wait for its
+    # outcome rather than report a failure that might not be one.
+    try:
+        return future.result(timeout=WRITE_TIMEOUT)
+    except FutureTimeoutError:
+        raise WriteOutcomeUnknown("database write is still running; its outcome is unknown") from None
+
+
+@app.errorhandler(WriteOutcomeUnknown)
+def write_outcome_unknown(error):
+    return "Penyimpanan belum selesai. Periksa data sebelum mengirim ulang.", 503
+
+
 def ensure_columns(conn, table_name, columns):
     existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table_name})")}
     for name, col_type in columns.items():
@@ -31,8 +154,84 @@ def has_column(conn, table_name, column_name):
     )
 
 
+def migrate_jadwal_cascade(conn):
+    # SQLite cannot ALTER a foreign key, so older databases get jadwal_tanam
+    # rebuilt with ON DELETE CASCADE. Extra legacy columns are kept as-is.
+    fks = conn.execute("PRAGMA foreign_key_list(jadwal_tanam)").fetchall()
+    if any(fk["table"] == "pola_tanam" and fk["on_delete"] == "CASCADE" for fk in fks):
+        return
+
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'jadwal_tanam'"
+    ).fetchone()["sql"]
+    new_sql = re.sub(
+        r'^CREATE TABLE\s+"?jadwal_tanam"?',
+        "CREATE TABLE jadwal_tanam_new",
+        table_sql,
+        count=1,
+    )
+    new_sql, found = re.subn(
+        r"REFERENCES\s+pola_tanam\s*\(\s*id\s*\)",
+        "REFERENCES pola_tanam(id) ON DELETE CASCADE",
+        new_sql,
+        count=1,
+    )
+    if not found:
+        end = new_sql.rindex(")")
+        new_sql = (
+            new_sql[:end].rstrip()
+            + ",\n            FOREIGN KEY (pola_id) REFERENCES pola_tanam(id) ON DELETE CASCADE\n        "
+            + new_sql[end:]
+        )
+    columns = ", ".join(
+        row["name"] for row in conn.execute("PRAGMA table_info(jadwal_tanam)")
+    )
+
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("BEGIN")
+    conn.execute(new_sql)
+    fks = conn.execute("PRAGMA foreign_key_list(jadwal_tanam_new)").fetchall()
+    if not any(fk["table"] == "pola_tanam" and fk["on_delete"] == "CASCADE" for fk in fks):
+        conn.rollback()
+        conn.execute("PRAGMA foreign_keys = ON")
+        raise RuntimeError("jadwal_tanam migration did not produce an ON DELETE CASCADE foreign key")
+    # Orphaned rows left behind by the old two-step delete would violate the
+    # FK, so they move to jadwal_tanam_orphans instead of being lost.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jadwal_tanam_orphans AS
+        SELECT * FROM jadwal_tanam WHERE 0
+        """
+    )
+    orphans = conn.execute(
+        f"""
+        INSERT INTO jadwal_tanam_orphans ({columns})
+        SELECT {columns} FROM jadwal_tanam
+        WHERE pola_id NOT IN (SELECT id FROM pola_tanam)
+        """
+    ).rowcount
+    conn.execute(
+        f"""
+        INSERT INTO jadwal_tanam_new ({columns})
+        SELECT {columns} FROM jadwal_tanam
+        WHERE pola_id IN (SELECT id FROM pola_tanam)
+        """
+    )
+    if orphans:
+        app.logger.warning(
+            "Moved %d jadwal_tanam rows without a matching pola_tanam to jadwal_tanam_orphans",
+            orphans,
+        )
+    conn.execute("DROP TABLE jadwal_tanam")
+    conn.execute("ALTER TABLE jadwal_tanam_new RENAME TO jadwal_tanam")
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
 def init_db():
     conn = get_db()
+    # WAL lets readers keep working while the writer holds its transaction.
+    conn.execute("PRAGMA journal_mode = WAL")
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS pola_tanam (
@@ -83,7 +282,7 @@ def init_db():
             kode_bibit TEXT NOT NULL DEFAULT '',
             no_pendistribusian TEXT NOT NULL DEFAULT '',
             created_at TEXT NOT NULL,
-            FOREIGN KEY (pola_id) REFERENCES pola_tanam(id)
+            FOREIGN KEY (pola_id) REFERENCES pola_tanam(id) ON DELETE CASCADE
         )
         """
     )
@@ -100,6 +299,11 @@ def init_db():
             "realisasi_kg": "REAL NOT NULL DEFAULT 0",
         },
     )
+    conn.commit()
+
+    migrate_jadwal_cascade(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jadwal_tanam_pola_id ON jadwal_tanam(pola_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pola_tanam_kelompok ON pola_tanam(kelompok_tani)")
 
     conn.commit()
     conn.close()
@@ -119,6 +323,11 @@ def parse_int(value, default=1):
         return default
 
 
+def parse_ids(values):
+    ids = (parse_int(value, None) for value in values)
+    return list(dict.fromkeys(item_id for item_id in ids if item_id is not None))
+
+
 def build_date_filter(period: str, value: str):
     where = ""
     params = []
@@ -276,55 +485,56 @@ def index():
         lon = request.form.get("lon")
 
         if all([kode_petani, nama_petani, lokasi, alamat_lengkap, komoditas]):
-            conn = get_db()
             kontrak_lama_text = f"{kontrak_bulan} bulan"
-            if has_column(conn, "pola_tanam", "kontrak_lama"):
-                conn.execute(
-                    """
-                    INSERT INTO pola_tanam
-                    (kode_petani, nama_petani, kelompok_tani, lokasi, alamat_lengkap, telepon, komoditas, kontrak_lama, kontrak_bulan, target_yield, lat, lon, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        kode_petani,
-                        nama_petani,
-                        kelompok_tani,
-                        lokasi,
-                        alamat_lengkap,
-                        telepon,
-                        komoditas,
-                        kontrak_lama_text,
-                        kontrak_bulan,
-                        target_yield,
-                        parse_float(lat) if lat else None,
-                        parse_float(lon) if lon else None,
-                        datetime.now().isoformat(timespec="seconds"),
-                    ),
-                )
-            else:
-                conn.execute(
-                    """
-                    INSERT INTO pola_tanam
-                    (kode_petani, nama_petani, kelompok_tani, lokasi, alamat_lengkap, telepon, komoditas, kontrak_bulan, target_yield, lat, lon, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        kode_petani,
-                        nama_petani,
-                        kelompok_tani,
-                        lokasi,
-                        alamat_lengkap,
-                        telepon,
-                        komoditas,
-                        kontrak_bulan,
-                        target_yield,
-                        parse_float(lat) if lat else None,
-                        parse_float(lon) if lon else None,
-                        datetime.now().isoformat(timespec="seconds"),
-                    ),
-                )
-            conn.commit()
-            conn.close()
+
+            def save(conn):
+                if has_column(conn, "pola_tanam", "kontrak_lama"):
+                    conn.execute(
+                        """
+                        INSERT INTO pola_tanam
+                        (kode_petani, nama_petani, kelompok_tani, lokasi, alamat_lengkap, telepon, komoditas, kontrak_lama, kontrak_bulan, target_yield, lat, lon, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            kode_petani,
+                            nama_petani,
+                            kelompok_tani,
+                            lokasi,
+                            alamat_lengkap,
+                            telepon,
+                            komoditas,
+                            kontrak_lama_text,
+                            kontrak_bulan,
+                            target_yield,
+                            parse_float(lat) if lat else None,
+                            parse_float(lon) if lon else None,
+                            datetime.now().isoformat(timespec="seconds"),
+                        ),
+                    )
+                else:
+                    conn.execute(
+                        """
+                        INSERT INTO pola_tanam
+                        (kode_petani, nama_petani, kelompok_tani, lokasi, alamat_lengkap, telepon, komoditas, kontrak_bulan, target_yield, lat, lon, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            kode_petani,
+                            nama_petani,
+                            kelompok_tani,
+                            lokasi,
+                            alamat_lengkap,
+                            telepon,
+                            komoditas,
+                            kontrak_bulan,
+                            target_yield,
+                            parse_float(lat) if lat else None,
+                            parse_float(lon) if lon else None,
+                            datetime.now().isoformat(timespec="seconds"),
+                        ),
+                    )
+
+            run_write(save)
         return redirect(url_for("list_pola"))
 
     conn = get_db()
@@ -371,14 +581,39 @@ def update_row(row_id: int):
     lon = request.form.get("lon")
 
     if all([kode_petani, nama_petani, lokasi, alamat_lengkap, komoditas]):
-        conn = get_db()
         kontrak_lama_text = f"{kontrak_bulan} bulan"
-        if has_column(conn, "pola_tanam", "kontrak_lama"):
-            conn.execute(
-                """
+
+        def save(conn):
+            if has_column(conn, "pola_tanam", "kontrak_lama"):
+                conn.execute(
+                    """
+                    UPDATE pola_tanam
+                    SET kode_petani = ?, nama_petani = ?, kelompok_tani = ?, lokasi = ?, alamat_lengkap = ?, telepon = ?,
+                        komoditas = ?, kontrak_lama = ?, kontrak_bulan = ?, target_yield = ?, lat = ?, lon = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        kode_petani,
+                        nama_petani,
+                        kelompok_tani,
+                        lokasi,
+                        alamat_lengkap,
+                        telepon,
+                        komoditas,
+                        kontrak_lama_text,
+                        kontrak_bulan,
+                        target_yield,
+                        parse_float(lat) if lat else None,
+                        parse_float(lon) if lon else None,
+                        row_id,
+                    ),
+                )
+            else:
+                conn.execute(
+                    """
                 UPDATE pola_tanam
                 SET kode_petani = ?, nama_petani = ?, kelompok_tani = ?, lokasi = ?, alamat_lengkap = ?, telepon = ?,
-                    komoditas = ?, kontrak_lama = ?, kontrak_bulan = ?, target_yield = ?, lat = ?, lon = ?
+                    komoditas = ?, kontrak_bulan = ?, target_yield = ?, lat = ?, lon = ?
                 WHERE id = ?
                 """,
                 (
@@ -389,39 +624,15 @@ def update_row(row_id: int):
                     alamat_lengkap,
                     telepon,
                     komoditas,
-                    kontrak_lama_text,
                     kontrak_bulan,
-                    target_yield,
-                    parse_float(lat) if lat else None,
-                    parse_float(lon) if lon else None,
-                    row_id,
-                ),
-            )
-        else:
-            conn.execute(
-                """
-            UPDATE pola_tanam
-            SET kode_petani = ?, nama_petani = ?, kelompok_tani = ?, lokasi = ?, alamat_lengkap = ?, telepon = ?,
-                komoditas = ?, kontrak_bulan = ?, target_yield = ?, lat = ?, lon = ?
-            WHERE id = ?
-            """,
-            (
-                kode_petani,
-                nama_petani,
-                kelompok_tani,
-                lokasi,
-                alamat_lengkap,
-                telepon,
-                komoditas,
-                kontrak_bulan,
-                    target_yield,
-                    parse_float(lat) if lat else None,
-                    parse_float(lon) if lon else None,
-                    row_id,
-                ),
-            )
-        conn.commit()
-        conn.close()
+                        target_yield,
+                        parse_float(lat) if lat else None,
+                        parse_float(lon) if lon else None,
+                        row_id,
+                    ),
+                )
+
+        run_write(save)
 
     return redirect(url_for("list_pola"))
 
@@ -438,16 +649,107 @@ def list_pola():
         """
     ).fetchall()
     conn.close()
-    return render_template("list.html", rows=rows)
+    kelompok_list = sorted({row["kelompok_tani"] for row in rows if row["kelompok_tani"]})
+    return render_template("list.html", rows=rows, kelompok_list=kelompok_list)
 
 
 @app.post("/delete/<int:row_id>")
 def delete_row(row_id: int):
-    conn = get_db()
-    conn.execute("DELETE FROM pola_tanam WHERE id = ?", (row_id,))
-    conn.execute("DELETE FROM jadwal_tanam WHERE pola_id = ?", (row_id,))
-    conn.commit()
-    conn.close()
+    # jadwal_tanam rows follow through ON DELETE CASCADE.
+    run_write(lambda conn: conn.execute("DELETE FROM pola_tanam WHERE id = ?", (row_id,)))
+    return redirect(url_for("list_pola"))
+
+
+@app.post("/bulk/petani")
+def bulk_petani():
+    ids = parse_ids(request.form.getlist("ids"))
+    action = request.form.get("action", "")
+    kelompok_tani = request.form.get("kelompok_tani", "").strip()
+
+    if not ids:
+        abort(400, description="Tidak ada petani yang dipilih.")
+    if action not in ("hapus", "kelompok"):
+        abort(400, description="Aksi tidak dikenal.")
+    if action == "kelompok" and not kelompok_tani:
+        abort(400, description="Kelompok tani baru belum diisi.")
+
+    def apply(conn):
+        if action == "hapus":
+            conn.execute(
+                "DELETE FROM pola_tanam WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(ids),),
+            )
+        else:
+            conn.execute(
+                "UPDATE pola_tanam SET kelompok_tani = ? WHERE id IN (SELECT value FROM json_each(?))",
+                (kelompok_tani, json.dumps(ids)),
+            )
+
+    run_write(apply)
+    return redirect(url_for("list_pola"))
+
+
+@app.post("/bulk/jadwal")
+def bulk_jadwal():
+    row_id = parse_int(request.form.get("row_id"), None)
+    item_ids = parse_ids(request.form.getlist("item_ids"))
+    pola_ids = parse_ids(request.form.getlist("ids"))
+    kelompok_tani = request.form.get("scope_kelompok", "").strip()
+    jenis = request.form.get("scope_jenis", "").strip()
+    action = request.form.get("action", "")
+    value = request.form.get("value", "").strip()
+    target_pola_id = parse_int(request.form.get("target_pola_id"), None)
+
+    if item_ids:
+        where = "id IN (SELECT value FROM json_each(?))"
+        params = [json.dumps(item_ids)]
+        if row_id is not None:
+            where += " AND pola_id = ?"
+            params.append(row_id)
+    elif pola_ids:
+        where = "pola_id IN (SELECT value FROM json_each(?))"
+        params = [json.dumps(pola_ids)]
+    elif kelompok_tani:
+        where = "pola_id IN (SELECT id FROM pola_tanam WHERE kelompok_tani = ?)"
+        params = [kelompok_tani]
+    else:
+        abort(400, description="Tidak ada jadwal yang dipilih.")
+    if jenis:
+        where += " AND jenis = ?"
+        params.append(jenis)
+
+    if action not in ("hapus", "kode_bibit", "no_pendistribusian", "pindah"):
+        abort(400, description="Aksi tidak dikenal.")
+    if action in ("kode_bibit", "no_pendistribusian") and not value:
+        abort(400, description="Nilai baru belum diisi.")
+    if action == "pindah" and target_pola_id is None:
+        abort(400, description="Petani tujuan belum dipilih.")
+
+    def apply(conn):
+        if action == "hapus":
+            conn.execute(f"DELETE FROM jadwal_tanam WHERE {where}", params)
+        elif action == "pindah":
+            # Checked inside the write so the target cannot vanish in between.
+            if not conn.execute(
+                "SELECT 1 FROM pola_tanam WHERE id = ?", (target_pola_id,)
+            ).fetchone():
+                return False
+            conn.execute(
+                f"UPDATE jadwal_tanam SET pola_id = ? WHERE {where}",
+                [target_pola_id, *params],
+            )
+        else:
+            conn.execute(
+                f"UPDATE jadwal_tanam SET {action} = ? WHERE {where}",
+                [value, *params],
+            )
+        return True
+
+    if not run_write(apply):
+        abort(400, description="Petani tujuan tidak ditemukan.")
+
+    if row_id is not None:
+        return redirect(url_for("schedule", row_id=row_id))
     return redirect(url_for("list_pola"))
 
 
@@ -468,6 +770,7 @@ def schedule(row_id: int):
         return redirect(url_for("index"))
 
     if request.method == "POST":
+        conn.close()
         tanggal = request.form.get("tanggal", "").strip()
         jenis = request.form.get("jenis", "panen").strip() or "panen"
         kegiatan = request.form.get("kegiatan", "").strip()
@@ -478,27 +781,27 @@ def schedule(row_id: int):
         kode_bibit = request.form.get("kode_bibit", "").strip()
         no_pendistribusian = request.form.get("no_pendistribusian", "").strip()
         if tanggal and kegiatan:
-            conn.execute(
-                """
-                INSERT INTO jadwal_tanam (pola_id, tanggal, jenis, kegiatan, estimasi_kg, realisasi_kg, qty_benih_kg, qty_pemberian_bibit, kode_bibit, no_pendistribusian, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    row_id,
-                    tanggal,
-                    jenis,
-                    kegiatan,
-                    estimasi_kg,
-                    realisasi_kg,
-                    qty_benih_kg,
-                    qty_pemberian_bibit,
-                    kode_bibit,
-                    no_pendistribusian,
-                    datetime.now().isoformat(timespec="seconds"),
-                ),
+            run_write(
+                lambda conn: conn.execute(
+                    """
+                    INSERT INTO jadwal_tanam (pola_id, tanggal, jenis, kegiatan, estimasi_kg, realisasi_kg, qty_benih_kg, qty_pemberian_bibit, kode_bibit, no_pendistribusian, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        row_id,
+                        tanggal,
+                        jenis,
+                        kegiatan,
+                        estimasi_kg,
+                        realisasi_kg,
+                        qty_benih_kg,
+                        qty_pemberian_bibit,
+                        kode_bibit,
+                        no_pendistribusian,
+                        datetime.now().isoformat(timespec="seconds"),
+                    ),
+                )
             )
-            conn.commit()
-        conn.close()
         return redirect(url_for("schedule", row_id=row_id))
 
     jadwal = conn.execute(
@@ -510,6 +813,10 @@ def schedule(row_id: int):
         """,
         (row_id,),
     ).fetchall()
+    petani_options = conn.execute(
+        "SELECT id, kode_petani, nama_petani FROM pola_tanam WHERE id != ? ORDER BY nama_petani",
+        (row_id,),
+    ).fetchall()
 
     total_estimasi = sum(
         parse_float(item["estimasi_kg"]) for item in jadwal if item["jenis"] == "panen"
@@ -538,6 +845,7 @@ def schedule(row_id: int):
         sisa=sisa,
         total_tanam_benih=total_tanam_benih,
         total_pemberian_bibit=total_pemberian_bibit,
+        petani_options=petani_options,
         edit_item=None,
     )
 
@@ -569,6 +877,10 @@ def edit_schedule(row_id: int, item_id: int):
         """,
         (row_id,),
     ).fetchall()
+    petani_options = conn.execute(
+        "SELECT id, kode_petani, nama_petani FROM pola_tanam WHERE id != ? ORDER BY nama_petani",
+        (row_id,),
+    ).fetchall()
 
     total_estimasi = sum(
         parse_float(entry["estimasi_kg"])
@@ -606,6 +918,7 @@ def edit_schedule(row_id: int, item_id: int):
         sisa=sisa,
         total_tanam_benih=total_tanam_benih,
         total_pemberian_bibit=total_pemberian_bibit,
+        petani_options=petani_options,
         edit_item=item,
     )
 
@@ -623,39 +936,39 @@ def update_schedule(row_id: int, item_id: int):
     no_pendistribusian = request.form.get("no_pendistribusian", "").strip()
 
     if tanggal and kegiatan:
-        conn = get_db()
-        conn.execute(
-            """
-            UPDATE jadwal_tanam
-            SET tanggal = ?, jenis = ?, kegiatan = ?, estimasi_kg = ?, realisasi_kg = ?, qty_benih_kg = ?,
-                qty_pemberian_bibit = ?, kode_bibit = ?, no_pendistribusian = ?
-            WHERE id = ? AND pola_id = ?
-            """,
-            (
-                tanggal,
-                jenis,
-                kegiatan,
-                estimasi_kg,
-                realisasi_kg,
-                qty_benih_kg,
-                qty_pemberian_bibit,
-                kode_bibit,
-                no_pendistribusian,
-                item_id,
-                row_id,
-            ),
+        run_write(
+            lambda conn: conn.execute(
+                """
+                UPDATE jadwal_tanam
+                SET tanggal = ?, jenis = ?, kegiatan = ?, estimasi_kg = ?, realisasi_kg = ?, qty_benih_kg = ?,
+                    qty_pemberian_bibit = ?, kode_bibit = ?, no_pendistribusian = ?
+                WHERE id = ? AND pola_id = ?
+                """,
+                (
+                    tanggal,
+                    jenis,
+                    kegiatan,
+                    estimasi_kg,
+                    realisasi_kg,
+                    qty_benih_kg,
+                    qty_pemberian_bibit,
+                    kode_bibit,
+                    no_pendistribusian,
+                    item_id,
+                    row_id,
+                ),
+            )
         )
-        conn.commit()
-        conn.close()
     return redirect(url_for("schedule", row_id=row_id))
 
 
 @app.post("/schedule/<int:row_id>/delete/<int:item_id>")
 def delete_schedule(row_id: int, item_id: int):
-    conn = get_db()
-    conn.execute("DELETE FROM jadwal_tanam WHERE id = ?", (item_id,))
-    conn.commit()
-    conn.close()
+    run_write(
+        lambda conn: conn.execute(
+            "DELETE FROM jadwal_tanam WHERE id = ? AND pola_id = ?", (item_id, row_id)
+        )
+    )
     return redirect(url_for("schedule", row_id=row_id))
 
 
@@ -680,4 +993,4 @@ def distribution_detail(no_pendistribusian: str):
 
 if __name__ == "__main__":
     init_db()
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    app.run(host="127.0.0.1", port=5000, debug=True)
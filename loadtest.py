@@ -0,0 +1,235 @@
+import argparse
+import http.client
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent
+READ_PATHS = ["/", "/list"]
+
+DEV_SERVER = (
+    "import sys; from app import app, init_db; init_db(); "
+    "app.run(host='127.0.0.1', port=int(sys.argv[1]), debug=True, use_reloader=False)"
+)
+
+
+def worker(host, port, deadline, write_ratio, pola_id, stats, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    ok = errors = writes = 0
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        try:
+            is_write = pola_id is not None and rng.random() < write_ratio
+            if is_write:
+                body = urlencode(
+                    {
+                        "tanggal": "2026-01-01",
+                        "jenis": "pemupukan",
+                        "kegiatan": "Pemupukan 1",
+                    }
+                )
+                conn.request(
+                    "POST",
+                    f"/schedule/{pola_id}",
+                    body=body,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                )
+            else:
+                conn.request("GET", rng.choice(READ_PATHS))
+            response = conn.getresponse()
+            response.read()
+            if response.status < 400:
+                ok += 1
+                writes += is_write
+            else:
+                errors += 1
+            if response.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+    conn.close()
+    with lock:
+        stats["ok"] += ok
+        stats["errors"] += errors
+        stats["writes"] += writes
+
+
+def run_load(url, concurrency, duration, write_ratio, pola_id):
+    parts = urlsplit(url)
+    stats = {"ok": 0, "errors": 0, "writes": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(parts.hostname, parts.port or 80, deadline, write_ratio, pola_id, stats, lock),
+        )
+        for _ in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    stats["rps"] = stats["ok"] / elapsed
+    return stats
+
+
+def wait_for_server(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/list")
+            conn.getresponse().read()
+            conn.close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def first_pola_id(db_path):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT MIN(id) FROM pola_tanam").fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def seed_petani(port):
+    body = urlencode(
+        {
+            "kode_petani": "LOAD-001",
+            "nama_petani": "Petani Uji",
+            "lokasi": "Bogor",
+            "alamat_lengkap": "Bogor, Jawa Barat",
+            "komoditas": "Cabai",
+        }
+    )
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request(
+        "POST",
+        "/input",
+        body=body,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    conn.getresponse().read()
+    conn.close()
+
+
+def report(label, stats):
+    total = stats["ok"] + stats["errors"]
+    share = stats["writes"] / total * 100 if total else 0
+    print(
+        f"{label}: {stats['rps']:.1f} req/s "
+        f"({stats['ok']} ok, {stats['errors']} errors, {stats['writes']} writes = {share:.1f}%)"
+    )
+
+
+def run_server(label, command, args):
+    # Each run gets a fresh copy so the real database is never touched.
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "pola_tanam.db"
+        source_db = BASE_DIR / "pola_tanam.db"
+        if source_db.exists():
+            shutil.copy(source_db, db_path)
+        env = dict(os.environ, POLA_TANAM_DB=str(db_path), PORT=str(args.port))
+        process = subprocess.Popen(
+            command,
+            cwd=BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not wait_for_server(args.port):
+                print(f"{label}: server did not start")
+                return None
+            pola_id = first_pola_id(db_path)
+            if pola_id is None and args.write_ratio:
+                seed_petani(args.port)
+                pola_id = first_pola_id(db_path)
+            if pola_id is None and args.write_ratio:
+                print(f"{label}: no farmer to write to")
+                return None
+            stats = run_load(
+                f"http://127.0.0.1:{args.port}",
+                args.concurrency,
+                args.duration,
+                args.write_ratio,
+                pola_id,
+            )
+        finally:
+            process.terminate()
+            process.wait()
+    report(label, stats)
+    return stats["rps"]
+
+
+def compare(args):
+    servers = [
+        ("dev server (app.py)", [sys.executable, "-c", DEV_SERVER, str(args.port)]),
+        ("production (serve.py)", [sys.executable, str(BASE_DIR / "serve.py")]),
+    ]
+    speedups = []
+    for round_no in range(1, args.rounds + 1):
+        print(f"round {round_no}/{args.rounds}")
+        results = [run_server(label, command, args) for label, command in servers]
+        if all(results):
+            speedups.append(results[1] / results[0])
+            print(f"  speedup: {speedups[-1]:.2f}x")
+
+    if speedups:
+        speedups.sort()
+        median = speedups[len(speedups) // 2]
+        # Single runs are noisy on small machines; report the spread.
+        print(
+            f"speedup over {len(speedups)} rounds: "
+            f"{speedups[0]:.2f}x - {speedups[-1]:.2f}x (median {median:.2f}x)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load test for Pola Tanam.")
+    parser.add_argument("--url", help="Run against an already running server.")
+    parser.add_argument("--compare", action="store_true", help="Start the dev and production servers in turn and compare them.")
+    parser.add_argument("--port", type=int, default=8765, help="Port used by --compare.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run.")
+    parser.add_argument("--rounds", type=int, default=5, help="Dev/production run pairs used by --compare.")
+    parser.add_argument("--write-ratio", type=float, default=None, help="Share of requests that insert a schedule item.")
+    parser.add_argument("--pola-id", type=int, help="Farmer id that receives writes in --url mode.")
+    args = parser.parse_args()
+
+    if args.compare:
+        # The compare runs use throwaway databases, so writes are on by default.
+        if args.write_ratio is None:
+            args.write_ratio = 0.1
+        compare(args)
+    elif args.url:
+        if args.write_ratio and args.pola_id is None:
+            parser.error("--write-ratio needs --pola-id in --url mode")
+        stats = run_load(
+            args.url,
+            args.concurrency,
+            args.duration,
+            args.write_ratio or 0.0,
+            args.pola_id,
+        )
+        report(args.url, stats)
+    else:
+        parser.error("pass --url or --compare")
+
+
+if __name__ == "__main__":
+    main()
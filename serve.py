@@ -0,0 +1,30 @@
+import os
+
+from waitress import serve
+
+from app import app, init_db, start_writer
+
+
+# This is a single process. Flask routing and Jinja rendering hold the GIL,
+# so the request threads overlap on SQLite and socket I/O but do not spread
+# reads across CPU cores; more cores do not raise read throughput here.
+# Compared with the dev server, the gain comes from dropping debug mode,
+# WAL reads, and batched commits on the single writer.
+
+
+def main():
+    host = os.getenv("HOST", "127.0.0.1")
+    port = int(os.getenv("PORT", "8000"))
+    threads = int(os.getenv("THREADS", str((os.cpu_count() or 1) * 4)))
+
+    # Schema setup and migrations run once here, not per worker thread.
+    init_db()
+    # Request threads read through their own connections; every write is
+    # queued to this single writer so SQLite never sees competing writers.
+    start_writer()
+    print(f"Pola Tanam serving on http://{host}:{port} ({threads} threads)")
+    serve(app, host=host, port=port, threads=threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app as pola_app  # noqa: E402
+
+
+LEGACY_SCHEMA = """
+CREATE TABLE pola_tanam (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama_petani TEXT NOT NULL,
+    lokasi TEXT NOT NULL,
+    komoditas TEXT NOT NULL,
+    kontrak_lama TEXT NOT NULL,
+    target_yield TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE jadwal_tanam (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pola_id INTEGER NOT NULL,
+    tanggal TEXT NOT NULL,
+    kegiatan TEXT NOT NULL,
+    estimasi_kg REAL NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    supplier TEXT NOT NULL DEFAULT ''{fk}
+);
+INSERT INTO pola_tanam (id, nama_petani, lokasi, komoditas, kontrak_lama, target_yield, created_at)
+VALUES (1, 'Budi', 'Bogor', 'Cabai', '6 bulan', '100', '2026-01-01');
+INSERT INTO jadwal_tanam (pola_id, tanggal, kegiatan, created_at, supplier)
+VALUES (1, '2026-02-01', 'Tanam Benih', '2026-01-01', 'CV Tani'),
+       (99, '2026-02-01', 'Tanam Benih', '2026-01-01', 'Yatim');
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "pola_tanam.db"
+    monkeypatch.setattr(pola_app, "DB_PATH", path)
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    pola_app.init_db()
+    pola_app.app.config["TESTING"] = True
+    return pola_app.app.test_client()
+
+
+def add_petani(conn, nama):
+    return conn.execute(
+        """
+        INSERT INTO pola_tanam (kode_petani, nama_petani, lokasi, komoditas, created_at)
+        VALUES (?, ?, 'Bogor', 'Cabai', '2026-01-01')
+        """,
+        (nama.upper(), nama),
+    ).lastrowid
+
+
+def add_jadwal(conn, pola_id, kode_bibit="", jenis="tanam_benih"):
+    return conn.execute(
+        """
+        INSERT INTO jadwal_tanam (pola_id, tanggal, jenis, kegiatan, kode_bibit, created_at)
+        VALUES (?, '2026-02-01', ?, 'Tanam Benih', ?, '2026-01-01')
+        """,
+        (pola_id, jenis, kode_bibit),
+    ).lastrowid
+
+
+def cascade_fks(conn):
+    return [
+        fk
+        for fk in conn.execute("PRAGMA foreign_key_list(jadwal_tanam)")
+        if fk["table"] == "pola_tanam" and fk["on_delete"] == "CASCADE"
+    ]
+
+
+@pytest.mark.parametrize(
+    "fk",
+    [",\n    FOREIGN KEY (pola_id) REFERENCES pola_tanam(id)", ""],
+    ids=["plain-fk", "no-fk"],
+)
+def test_migrate_legacy_schema(db_path, fk, caplog):
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(LEGACY_SCHEMA.format(fk=fk))
+    legacy.close()
+
+    pola_app.init_db()
+    conn = pola_app.get_db()
+    first_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'jadwal_tanam'"
+    ).fetchone()["sql"]
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(jadwal_tanam)")}
+    rows = conn.execute("SELECT pola_id, supplier FROM jadwal_tanam").fetchall()
+    orphans = conn.execute("SELECT pola_id, supplier FROM jadwal_tanam_orphans").fetchall()
+    assert len(cascade_fks(conn)) == 1
+    conn.close()
+
+    assert "supplier" in columns
+    assert [tuple(row) for row in rows] == [(1, "CV Tani")]
+    assert [tuple(row) for row in orphans] == [(99, "Yatim")]
+    assert "Moved 1 jadwal_tanam rows" in caplog.text
+
+    pola_app.init_db()
+    conn = pola_app.get_db()
+    second_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'jadwal_tanam'"
+    ).fetchone()["sql"]
+    assert second_sql == first_sql
+    assert len(cascade_fks(conn)) == 1
+    assert conn.execute("SELECT COUNT(*) FROM jadwal_tanam").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM jadwal_tanam_orphans").fetchone()[0] == 1
+    conn.close()
+
+
+def test_bulk_jadwal_item_ids_scoped_to_row(client):
+    conn = pola_app.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+        sari = add_petani(conn, "Sari")
+        own_item = add_jadwal(conn, budi)
+        other_item = add_jadwal(conn, sari)
+    conn.close()
+
+    response = client.post(
+        "/bulk/jadwal",
+        data={
+            "row_id": budi,
+            "item_ids": [own_item, other_item],
+            "action": "kode_bibit",
+            "value": "BIBIT-9",
+        },
+    )
+    assert response.status_code == 302
+
+    client.post(
+        "/bulk/jadwal",
+        data={"row_id": budi, "item_ids": [other_item], "action": "hapus"},
+    )
+
+    conn = pola_app.get_db()
+    rows = dict(conn.execute("SELECT id, kode_bibit FROM jadwal_tanam").fetchall())
+    conn.close()
+    assert rows == {own_item: "BIBIT-9", other_item: ""}
+
+
+def test_bulk_petani_delete_cascades(client):
+    conn = pola_app.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+        sari = add_petani(conn, "Sari")
+        tono = add_petani(conn, "Tono")
+        add_jadwal(conn, budi)
+        add_jadwal(conn, sari)
+        kept = add_jadwal(conn, tono)
+    conn.close()
+
+    response = client.post("/bulk/petani", data={"ids": [budi, sari], "action": "hapus"})
+    assert response.status_code == 302
+
+    conn = pola_app.get_db()
+    petani = [row["id"] for row in conn.execute("SELECT id FROM pola_tanam")]
+    jadwal = [row["id"] for row in conn.execute("SELECT id FROM jadwal_tanam")]
+    conn.close()
+    assert petani == [tono]
+    assert jadwal == [kept]
+
+
+def test_bulk_jadwal_scoped_by_kelompok_and_jenis(client):
+    conn = pola_app.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+        sari = add_petani(conn, "Sari")
+        tono = add_petani(conn, "Tono")
+        conn.execute("UPDATE pola_tanam SET kelompok_tani = 'Tani Maju' WHERE id IN (?, ?)", (budi, sari))
+        conn.execute("UPDATE pola_tanam SET kelompok_tani = 'Tani Jaya' WHERE id = ?", (tono,))
+        budi_benih = add_jadwal(conn, budi)
+        sari_benih = add_jadwal(conn, sari)
+        sari_panen = add_jadwal(conn, sari, jenis="panen")
+        tono_benih = add_jadwal(conn, tono)
+    conn.close()
+
+    response = client.post(
+        "/bulk/jadwal",
+        data={
+            "scope_kelompok": "Tani Maju",
+            "scope_jenis": "tanam_benih",
+            "action": "no_pendistribusian",
+            "value": "DIST-2026-007",
+        },
+    )
+    assert response.status_code == 302
+
+    conn = pola_app.get_db()
+    rows = dict(conn.execute("SELECT id, no_pendistribusian FROM jadwal_tanam").fetchall())
+    conn.close()
+    assert rows == {
+        budi_benih: "DIST-2026-007",
+        sari_benih: "DIST-2026-007",
+        sari_panen: "",
+        tono_benih: "",
+    }
+
+
+def test_bulk_jadwal_pindah(client):
+    conn = pola_app.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+        sari = add_petani(conn, "Sari")
+        item = add_jadwal(conn, budi)
+    conn.close()
+
+    response = client.post(
+        "/bulk/jadwal",
+        data={"row_id": budi, "item_ids": [item], "action": "pindah", "target_pola_id": 9999},
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        "/bulk/jadwal",
+        data={"row_id": budi, "item_ids": [item], "action": "pindah", "target_pola_id": sari},
+    )
+    assert response.status_code == 302
+
+    conn = pola_app.get_db()
+    pola_id = conn.execute("SELECT pola_id FROM jadwal_tanam WHERE id = ?", (item,)).fetchone()[0]
+    conn.close()
+    assert pola_id == sari
+
+
+def test_bulk_petani_kelompok(client):
+    conn = pola_app.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+        sari = add_petani(conn, "Sari")
+        tono = add_petani(conn, "Tono")
+    conn.close()
+
+    response = client.post(
+        "/bulk/petani",
+        data={"ids": [budi, tono], "action": "kelompok", "kelompok_tani": "Tani Maju"},
+    )
+    assert response.status_code == 302
+
+    conn = pola_app.get_db()
+    rows = dict(conn.execute("SELECT id, kelompok_tani FROM pola_tanam").fetchall())
+    conn.close()
+    assert rows == {budi: "Tani Maju", sari: "", tono: "Tani Maju"}
+
+
+@pytest.mark.parametrize(
+    "url, data",
+    [
+        ("/bulk/jadwal", {"action": "kode_bibit", "value": ""}),
+        ("/bulk/jadwal", {"action": "reset", "value": "X"}),
+        ("/bulk/jadwal", {"action": "pindah"}),
+        ("/bulk/petani", {"action": "kelompok", "kelompok_tani": ""}),
+        ("/bulk/petani", {"action": "reset"}),
+    ],
+    ids=["empty-value", "unknown-jadwal-action", "no-target", "empty-kelompok", "unknown-petani-action"],
+)
+def test_bulk_rejects_no_op(client, url, data):
+    conn = pola_app.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+        item = add_jadwal(conn, budi, kode_bibit="LAMA")
+    conn.close()
+
+    response = client.post(url, data={"ids": [budi], "item_ids": [item], **data})
+    assert response.status_code == 400
+
+    conn = pola_app.get_db()
+    row = conn.execute(
+        "SELECT p.kelompok_tani, j.kode_bibit FROM jadwal_tanam j JOIN pola_tanam p ON p.id = j.pola_id"
+    ).fetchone()
+    conn.close()
+    assert tuple(row) == ("", "LAMA")
+
+
+def test_bulk_rejects_empty_selection(client):
+    assert client.post("/bulk/petani", data={"action": "hapus"}).status_code == 400
+    assert client.post("/bulk/jadwal", data={"action": "hapus"}).status_code == 400
+
+
+@pytest.fixture
+def writer(db_path, monkeypatch):
+    pola_app.init_db()
+    monkeypatch.setattr(pola_app, "_write_queue", None)
+    monkeypatch.setattr(pola_app, "_writer_thread", None)
+    return pola_app
+
+
+def test_writer_survives_connect_failure(writer, monkeypatch):
+    real_get_db = writer.get_db
+    calls = []
+
+    def flaky_get_db():
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("unable to open database file")
+        return real_get_db()
+
+    monkeypatch.setattr(writer, "get_db", flaky_get_db)
+    writer.start_writer()
+
+    with pytest.raises(sqlite3.OperationalError):
+        writer.run_write(lambda conn: add_petani(conn, "Budi"))
+    assert writer.run_write(lambda conn: add_petani(conn, "Budi"))
+    assert writer._writer_thread.is_alive()
+
+
+def submit(writer, job):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = writer.run_write(job)
+        except Exception as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def blocking_job(started, gate, result=None):
+    def job(conn):
+        started.set()
+        assert gate.wait(5)
+        return result
+
+    return job
+
+
+def wait_queued(writer, count):
+    deadline = time.monotonic() + 5
+    while writer._write_queue.qsize() < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def count_petani(writer):
+    return writer.run_write(
+        lambda conn: conn.execute("SELECT COUNT(*) FROM pola_tanam").fetchone()[0]
+    )
+
+
+def test_timed_out_job_behind_slow_job_in_same_batch_never_runs(writer, monkeypatch):
+    monkeypatch.setattr(writer, "WRITE_TIMEOUT", 0.5)
+    writer.start_writer()
+    first_started, first_gate = threading.Event(), threading.Event()
+    slow_started, slow_gate = threading.Event(), threading.Event()
+
+    first, _ = submit(writer, blocking_job(first_started, first_gate))
+    assert first_started.wait(5)
+    # Both queue up behind the first job and are taken as one batch.
+    slow, slow_outcome = submit(writer, blocking_job(slow_started, slow_gate, "selesai"))
+    wait_queued(writer, 1)
+    late, late_outcome = submit(writer, lambda conn: add_petani(conn, "Budi"))
+    wait_queued(writer, 2)
+    first_gate.set()
+    assert slow_started.wait(5)
+
+    late.join(5)
+    assert isinstance(late_outcome.get("error"), FutureTimeoutError)
+    slow_gate.set()
+    slow.join(5)
+    first.join(5)
+
+    # The slow job had already started, so its caller waited for the result.
+    assert slow_outcome == {"result": "selesai"}
+    # The timed-out insert was cancelled before it ran, so it never commits.
+    assert count_petani(writer) == 0
+
+
+def test_run_write_reports_unknown_outcome_for_stuck_job(writer, monkeypatch):
+    monkeypatch.setattr(writer, "WRITE_TIMEOUT", 0.1)
+    writer.start_writer()
+    started, gate = threading.Event(), threading.Event()
+
+    with pytest.raises(writer.WriteOutcomeUnknown):
+        writer.run_write(blocking_job(started, gate))
+    gate.set()
+    assert count_petani(writer) == 0
+
+
+def test_failing_job_does_not_roll_back_its_batch(writer):
+    writer.start_writer()
+    conn = writer.get_db()
+    with conn:
+        budi = add_petani(conn, "Budi")
+    conn.close()
+    started, gate = threading.Event(), threading.Event()
+
+    first, _ = submit(writer, blocking_job(started, gate))
+    assert started.wait(5)
+    # Both wait behind the first job and then commit in one transaction.
+    bad, bad_outcome = submit(writer, lambda conn: add_jadwal(conn, 9999))
+    wait_queued(writer, 1)
+    good, good_outcome = submit(
+        writer,
+        lambda conn: conn.execute(
+            "UPDATE pola_tanam SET kelompok_tani = 'Tani Maju' WHERE id = ?", (budi,)
+        ).rowcount,
+    )
+    wait_queued(writer, 2)
+    gate.set()
+    for thread in (first, bad, good):
+        thread.join(5)
+
+    assert isinstance(bad_outcome.get("error"), sqlite3.IntegrityError)
+    assert good_outcome == {"result": 1}
+    conn = writer.get_db()
+    kelompok = conn.execute("SELECT kelompok_tani FROM pola_tanam WHERE id = ?", (budi,)).fetchone()[0]
+    jadwal = conn.execute("SELECT COUNT(*) FROM jadwal_tanam").fetchone()[0]
+    conn.close()
+    assert (kelompok, jadwal) == ("Tani Maju", 0)